@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+import json
+import os
+import random
+import re
+import signal
+import sys
+import time
+from collections import defaultdict
+
+import obedy_kobylisy
+
+CORPUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus', 'menicka.jsonl')
+MENICKA_RESTAURANTS = list(obedy_kobylisy.MENICKA_IDS.keys())
+ROW_TIME_BUDGET = 0.05 # seconds, rows slower than this are only reported
+ABORT_FACTOR = 20 # rows running this many budgets are considered runaway backtracking, aborted and fail the run
+FUZZ_ROUNDS = 200
+FUZZ_SEED = 42
+
+class BudgetExceeded(Exception):
+    pass
+
+class TimedRe:
+    # Stands in for the re module inside obedy_kobylisy and records time spent in every pattern.
+    def __init__(self):
+        self.restaurant = None
+        self.timings = defaultdict(lambda: [0, 0.0, 0.0]) # calls, total, worst
+
+    def timed(self, func, pattern, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(pattern, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            # The same pattern is used by several corrections, keep them apart.
+            timing = self.timings[(self.restaurant, getattr(pattern, 'pattern', pattern))]
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+
+    def sub(self, pattern, *args, **kwargs):
+        return self.timed(re.sub, pattern, *args, **kwargs)
+
+    def match(self, pattern, *args, **kwargs):
+        return self.timed(re.match, pattern, *args, **kwargs)
+
+    def search(self, pattern, *args, **kwargs):
+        return self.timed(re.search, pattern, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(re, name)
+
+def on_alarm(signum, frame):
+    raise BudgetExceeded()
+
+def run_with_budget(func, budget):
+    # The regex engine checks for signals while matching, so an alarm can break out of catastrophic backtracking.
+    previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, budget * ABORT_FACTOR)
+    start = time.perf_counter()
+    try:
+        func()
+        aborted = False
+    except BudgetExceeded:
+        aborted = True
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+    return (time.perf_counter() - start, aborted)
+
+def new_correction(restaurant):
+    return getattr(obedy_kobylisy, f'{restaurant}_correction')()
+
+def parse_entry(entry):
+    # Like impl_menicka, all days of one page go through the same correction function, because meals can
+    # continue from the last row of one day.
+    correction_func = new_correction(entry['restaurant'])
+    return [obedy_kobylisy.parse_menicka_rows([tuple(row) for row in day['rows']], correction_func) for day in entry['days']]
+
+def load_corpus():
+    if not os.path.exists(CORPUS_FILE):
+        return []
+    with open(CORPUS_FILE, encoding='utf-8') as corpus_file:
+        return [json.loads(line) for line in corpus_file if line.strip() != '']
+
+def save_corpus(corpus):
+    os.makedirs(os.path.dirname(CORPUS_FILE), exist_ok=True)
+    with open(CORPUS_FILE, 'w', encoding='utf-8') as corpus_file:
+        for entry in corpus:
+            corpus_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+def record(restaurants):
+    # menicka.cz only shows the current week, so the corpus grows by running this regularly.
+    corpus = load_corpus()
+    known = {(entry['restaurant'], tuple(day['day'] for day in entry['days'])) for entry in corpus}
+    added = 0
+    for restaurant in restaurants:
+        (rows_by_day, _) = obedy_kobylisy.fetch_menicka(obedy_kobylisy.MENICKA_IDS[restaurant])
+        entry = {'restaurant': restaurant, 'days': [{'day': str(day), 'rows': rows} for (day, rows) in rows_by_day.items()]}
+        if (restaurant, tuple(day['day'] for day in entry['days'])) in known:
+            continue
+        for (day, expected) in zip(entry['days'], parse_entry(entry)):
+            day['expected'] = expected
+        corpus.append(entry)
+        added += 1
+
+    save_corpus(corpus)
+    print(f'Přidáno {added} stránek, celkem {len(corpus)}.')
+    return 0
+
+def bless():
+    # Accept the current output as the new golden results, e.g. after an intentional change in the corrections.
+    corpus = load_corpus()
+    for entry in corpus:
+        for (day, expected) in zip(entry['days'], parse_entry(entry)):
+            day['expected'] = expected
+    save_corpus(corpus)
+    print(f'Aktualizováno {len(corpus)} stránek.')
+    return 0
+
+def check():
+    corpus = load_corpus()
+    if len(corpus) == 0:
+        print(f'Korpus {CORPUS_FILE} je prázdný, nejdřív spusť "record".')
+        return 1
+
+    mismatches = 0
+    for entry in corpus:
+        for (day, actual) in zip(entry['days'], parse_entry(entry)):
+            if actual != day['expected']:
+                mismatches += 1
+                print(f'Rozdíl: {entry["restaurant"]} {day["day"]}')
+                print(f'  očekáváno: {json.dumps(day["expected"], ensure_ascii=False)}')
+                print(f'  výsledek:  {json.dumps(actual, ensure_ascii=False)}')
+
+    print(f'{sum(len(entry["days"]) for entry in corpus)} dní, {mismatches} rozdílů.')
+    return 1 if mismatches != 0 else 0
+
+def time_rows(timed_re, restaurant, rows, slow_rows):
+    # Feed the rows one by one through a single correction function, so that rows spanning two lines still work.
+    timed_re.restaurant = restaurant
+    correction_func = new_correction(restaurant)
+    for row in rows:
+        (elapsed, aborted) = run_with_budget(lambda: obedy_kobylisy.parse_menicka_rows([row], correction_func), ROW_TIME_BUDGET)
+        if elapsed > ROW_TIME_BUDGET or aborted:
+            slow_rows.append((restaurant, row, elapsed, aborted))
+        if aborted:
+            # The correction function might be left in a weird state.
+            correction_func = new_correction(restaurant)
+
+def run_timed(rows_by_restaurant):
+    timed_re = TimedRe()
+    slow_rows = []
+    obedy_kobylisy.re = timed_re
+    try:
+        for (restaurant, rows) in rows_by_restaurant.items():
+            time_rows(timed_re, restaurant, rows, slow_rows)
+    finally:
+        obedy_kobylisy.re = re
+
+    print('Čas podle vzoru (volání, celkem ms, nejhorší ms):')
+    for ((restaurant, pattern), (calls, total, worst)) in sorted(timed_re.timings.items(), key=lambda it: it[1][1], reverse=True):
+        print(f'{calls:8} {total * 1000:10.3f} {worst * 1000:10.3f}  {restaurant:10} {pattern}')
+
+    for (restaurant, row, elapsed, aborted) in slow_rows:
+        status = 'přerušeno' if aborted else f'{elapsed * 1000:.3f} ms'
+        print(f'Pomalý řádek ({restaurant}, {status}, {len(row[0])} znaků): {json.dumps(row, ensure_ascii=False)}')
+
+    # Timing alone is too noisy to fail on, only rows cut off by the alarm count as runaway backtracking.
+    aborted_rows = [row for row in slow_rows if row[3]]
+    print(f'{len(slow_rows)} řádků pomalejších než {ROW_TIME_BUDGET * 1000:.0f} ms, '
+          f'{len(aborted_rows)} přerušeno po {ROW_TIME_BUDGET * ABORT_FACTOR * 1000:.0f} ms.')
+    return 1 if len(aborted_rows) != 0 else 0
+
+def profile():
+    rows_by_restaurant = defaultdict(list)
+    for entry in load_corpus():
+        for day in entry['days']:
+            rows_by_restaurant[entry['restaurant']].extend(tuple(row) for row in day['rows'])
+
+    return run_timed(rows_by_restaurant)
+
+def mutate(rng, name, names):
+    # Long rows built out of pieces the patterns are sensitive to: digits, spaces, separators and repeated keywords.
+    size = rng.choice([10, 50, 200, 1000])
+    mutation = rng.randrange(6)
+    if mutation == 0:
+        return ' '.join([name] * size)
+    if mutation == 1:
+        return name + ' ' + '1' * size + rng.choice([' ', ',', '-', '/'])
+    if mutation == 2:
+        return ' '.join(['polévka'] * size) + ' ' + name
+    if mutation == 3:
+        return 'Menu 1 ' + ' '.join(['1 -'] * size) + ' menu 2 ' + name
+    if mutation == 4:
+        return name.replace(' ', ' ' * size)
+    return ' + '.join(rng.choice(names) for _ in range(size))
+
+def fuzz():
+    rows_by_restaurant = defaultdict(list)
+    for entry in load_corpus():
+        for day in entry['days']:
+            rows_by_restaurant[entry['restaurant']].extend(tuple(row) for row in day['rows'])
+
+    rng = random.Random(FUZZ_SEED)
+    fuzzed_rows_by_restaurant = {}
+    for restaurant in MENICKA_RESTAURANTS:
+        rows = rows_by_restaurant[restaurant] or [('Polévka + Menu 1 kuřecí prso 150 g', '139 Kč')]
+        names = [name for (name, _) in rows]
+        fuzzed_rows_by_restaurant[restaurant] = []
+        for _ in range(FUZZ_ROUNDS):
+            (name, price) = rng.choice(rows)
+            fuzzed_rows_by_restaurant[restaurant].append((mutate(rng, name, names), rng.choice([price, ''])))
+
+    return run_timed(fuzzed_rows_by_restaurant)
+
+def main(args):
+    if len(args) == 0 or args[0] not in ('record', 'bless', 'check', 'profile', 'fuzz'):
+        print('Použití: obedy_corpus.py record [restaurace...]|bless|check|profile|fuzz')
+        return 1
+
+    if args[0] == 'record':
+        restaurants = args[1:] if len(args) > 1 else MENICKA_RESTAURANTS
+        for restaurant in restaurants:
+            if restaurant not in obedy_kobylisy.MENICKA_IDS:
+                print(f'Neznámá restaurace "{restaurant}".')
+                return 1
+        return record(restaurants)
+
+    return globals()[args[0]]()
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
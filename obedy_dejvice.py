@@ -11,12 +11,7 @@ import requests
 import sys
 import pprint
 
-NORMAL = '\u001b[0m'
-BOLD = '\u001b[1m'
-ITALIC = '\u001b[3m'
-GREY = '\u001b[38;5;7m'
-BLUE = '\u001b[34m'
-DOUBLE_UNDERLINE = '\u001b[21m'
+from obedy_render import Renderer, column_widths, measure_menu, plain_output
 
 def resToJson(input):
     res = {}
@@ -292,15 +287,14 @@ def main():
 
     (menu_date, menu) = list(menu.items())[weekday]
 
-    name_width = max(len(max(menu, key=lambda index: len(index['name']))['name']), len('Název'))
-    price_width = max(len(max(menu, key=lambda index: len(index['price']))['price']), len('Cena'))
-    format_string = '{:3}' + '{{:{}}} {{:>{}}}'.format(name_width + 1, price_width + 1)
+    measured_menu = measure_menu(menu)
+    (name_width, price_width) = column_widths([measured_menu])
+    renderer = Renderer(name_width, price_width, plain_output())
 
-    print(BOLD + restaurant + NORMAL + ' ' + ITALIC + GREY + menu_date.strftime('%A') + ' ' + str(menu_date.day) + menu_date.strftime('. %B') + NORMAL)
-    print(DOUBLE_UNDERLINE + BLUE + format_string.format('#', 'Název', 'Cena') + NORMAL)
-
-    for count, meal in enumerate(menu):
-        print(format_string.format(str(count + 1), meal['name'], meal['price']))
+    renderer.restaurant_header(restaurant, menu_date.strftime('%A') + ' ' + str(menu_date.day) + menu_date.strftime('. %B'))
+    renderer.table_header()
+    renderer.menu(measured_menu)
+    renderer.flush()
 
 if __name__ == '__main__':
     main()
@@ -15,23 +15,14 @@ import requests_cache
 import requests
 from bs4 import BeautifulSoup
 
-NORMAL = '\u001b[0m'
-BOLD = '\u001b[1m'
-URL_START = '\u001b]8;;'
-URL_SEP = '\u001b\\'
-URL_END = '\u001b]8;;\u001b\\'
-ITALIC = '\u001b[3m'
-GREY = '\u001b[38;5;7m'
-BLUE = '\u001b[34m'
-DOUBLE_UNDERLINE = '\u001b[21m'
+from obedy_render import Renderer, column_widths, measure_menu, plain_output
 
 CACHE_TIMEOUT = 60 * 30
 CACHE_DIR = os.getenv('XDG_CACHE_HOME') if os.getenv('XDG_CACHE_HOME') else os.path.expanduser('~/.cache')
 
-requests_cache.install_cache(os.path.join(CACHE_DIR, 'obedy_kobylisy/requests'), 'filesystem', serializer='json', expire_after=CACHE_TIMEOUT) # expire after 30 minutes
 SCREENSHOT_CACHE_FILE_CIHELNA = os.path.join(CACHE_DIR, 'obedy_kobylisy/screenshot_cihelna')
-locale.setlocale(locale.LC_TIME, 'cs_CZ.UTF-8') # You better have this locale installed lmao
 ALL_RESTAURANTS = ['blekoti', 'kozlovna', 'cihelna', 'soucku']
+MENICKA_IDS = {'blekoti': 2421, 'cihelna': 5879, 'kozlovna': 4165, 'soucku': 2457}
 CIHELNA_URL = 'https://ucihelny.cz'
 
 def wait_for_elem(browser, locator):
@@ -51,7 +42,7 @@ def resToJson(input_arg):
     res['source_url'] = input_arg[2]
     return jsonDump(res)
 
-def impl_menicka(restaurant_id, correction_func):
+def fetch_menicka(restaurant_id):
     page_url = f'https://www.menicka.cz/tisk-profil.php?restaurace={restaurant_id}'
     page_content = requests.get(page_url, timeout=5000).text
     soup = BeautifulSoup(page_content, 'html.parser')
@@ -62,59 +53,75 @@ def impl_menicka(restaurant_id, correction_func):
         date_tag = menu_tag.find('h2')
         match_date = re.match(r'[^ ]* (\d+)\.(\d+)\.(\d+)', date_tag.text)
         day = date(int(match_date.group(3)), int(match_date.group(2)), int(match_date.group(1)))
-        meals = []
+        res[day] = []
         for meal_tag in menu_tag.find_all('tr'):
             meal_name_tag = meal_tag.find('td', attrs={'class': 'food'})
-            meal_name = meal_name_tag.text
-            # Sometimes, there are bogus rows.
-            if meal_name in (
-                'Polévka',
-                'Hlavní Jídla',
-                'Hlavní Jidla',
-                'Hlavní jídla',
-                'Hlavní jídla:',
-                'Hlavní jídla :',
-                'Speciality:',
-                'Specialita:',
-                'Specialita',
-                'SPECIALITA',
-                'Dezerty',
-                'Saláty',
-                'Specialita zahradnického centra',
-                'Šéfkuchař doporučuje',
-                'Bezmasá jídla',
-                'Gril',
-                'Minutka'
-            ):
-                continue
-            # Get rid of unnecessary information about the meal.
-            meal_name = re.sub(r'(\d+-)?\d+ ?g', '', meal_name) # g
-            meal_name = re.sub(r'\(?\d+ ?ks\)?(, )?', '', meal_name) # ks
-            meal_name = re.sub(r'\d, ?\d+l?', '', meal_name) # liters of soup
-            meal_name = re.sub(r'^\s+', '', meal_name) # leading space
-            meal_name = re.sub(r'\s+$', '', meal_name) # Trailing space
-            meal_name = re.sub(' +', ' ', meal_name) # repeating spaces
-
             meal_price_tag = meal_tag.find('td', attrs={'class': 'prize'})
-            corrected = correction_func(meal_name, meal_price_tag.text)
-            if corrected is None or corrected[0][0] == '':
-                continue
+            # Header rows don't always have a price cell.
+            meal_price = meal_price_tag.text if meal_price_tag is not None else ''
+            res[day].append((meal_name_tag.text, meal_price))
 
-            for (meal_name_corrected, meal_price_corrected) in corrected:
-                meals.append({'name': meal_name_corrected, 'price': meal_price_corrected})
+    return (res, page_url)
 
-        res[day] = []
-        # Remove duplicates
-        for meal in meals:
-            if meal not in res[day]:
-                res[day].append(meal)
+def parse_menicka_rows(rows, correction_func):
+    meals = []
+    for (meal_name, meal_price) in rows:
+        # Sometimes, there are bogus rows.
+        if meal_name in (
+            'Polévka',
+            'Hlavní Jídla',
+            'Hlavní Jidla',
+            'Hlavní jídla',
+            'Hlavní jídla:',
+            'Hlavní jídla :',
+            'Speciality:',
+            'Specialita:',
+            'Specialita',
+            'SPECIALITA',
+            'Dezerty',
+            'Saláty',
+            'Specialita zahradnického centra',
+            'Šéfkuchař doporučuje',
+            'Bezmasá jídla',
+            'Gril',
+            'Minutka'
+        ):
+            continue
+        # Get rid of unnecessary information about the meal.
+        meal_name = re.sub(r'(\d+-)?\d+ ?g', '', meal_name) # g
+        meal_name = re.sub(r'\(?\d+ ?ks\)?(, )?', '', meal_name) # ks
+        meal_name = re.sub(r'\d, ?\d+l?', '', meal_name) # liters of soup
+        meal_name = re.sub(r'^\s+', '', meal_name) # leading space
+        meal_name = re.sub(r'\s+$', '', meal_name) # Trailing space
+        meal_name = re.sub(' +', ' ', meal_name) # repeating spaces
+
+        corrected = correction_func(meal_name, meal_price)
+        if corrected is None or corrected[0][0] == '':
+            continue
+
+        for (meal_name_corrected, meal_price_corrected) in corrected:
+            meals.append({'name': meal_name_corrected, 'price': meal_price_corrected})
+
+    res = []
+    # Remove duplicates
+    for meal in meals:
+        if meal not in res:
+            res.append(meal)
+
+    return res
+
+def impl_menicka(restaurant_id, correction_func):
+    (rows_by_day, page_url) = fetch_menicka(restaurant_id)
+    res = OrderedDict()
+    for (day, rows) in rows_by_day.items():
+        res[day] = parse_menicka_rows(rows, correction_func)
 
     return (res, page_url)
 
 def default_correction_func(name, price):
     return [(name, price)]
 
-def blekoti():
+def blekoti_correction():
     def func(name, price):
         if name in ('Steaky přímo z grilu', 'Steaky přímo z venkovního grilu'):
             return None
@@ -138,10 +145,12 @@ def blekoti():
         return [(name, price)]
 
     func.menu_save = None
+    return func
 
-    return ('U Blekotů',) + impl_menicka(2421, func)
+def blekoti():
+    return ('U Blekotů',) + impl_menicka(MENICKA_IDS['blekoti'], blekoti_correction())
 
-def cihelna():
+def cihelna_correction():
     def func(name, price):
         if name == 'dcl Malinovka':
             name = '2 dcl malinovka'
@@ -189,11 +198,13 @@ def cihelna():
         return [(name, price)]
 
     func.menu_save = None
+    return func
 
-    menicka = impl_menicka(5879, func)
+def cihelna():
+    menicka = impl_menicka(MENICKA_IDS['cihelna'], cihelna_correction())
     return ('U Cihelny',) + menicka
 
-def kozlovna():
+def kozlovna_correction():
     def func(name, price):
         # Sometimes, the salad is on the same row.
         dual_entry_match = re.match(r'(.+) (\d+)(,|[^/]) ?-? ?(.+)', name)
@@ -220,9 +231,12 @@ def kozlovna():
         name = re.sub(r'(POLEDNÍ )?MENU( S POLÉVKOU)?:?', 'Polední menu:', name)
         return [(name, price)]
     func.menu_save = None
-    return ('Kozlovna Almara',) + impl_menicka(4165, func)
+    return func
 
-def soucku():
+def kozlovna():
+    return ('Kozlovna Almara',) + impl_menicka(MENICKA_IDS['kozlovna'], kozlovna_correction())
+
+def soucku_correction():
     def func(name, price):
         if re.search('vlastních krabiček', name) is not None:
             return None
@@ -307,9 +321,12 @@ def soucku():
 
         return [(name, price)]
 
-    return ('U Součků',) + impl_menicka(2457, func)
+    return func
 
-def main(requested_restaurants, weekday):
+def soucku():
+    return ('U Součků',) + impl_menicka(MENICKA_IDS['soucku'], soucku_correction())
+
+def main(requested_restaurants, weekday, plain):
     for restaurant in requested_restaurants:
         if restaurant not in globals():
             if weekday_to_number(restaurant) is None:
@@ -322,55 +339,35 @@ def main(requested_restaurants, weekday):
     weekly_menus = [globals()[restaurant]() for restaurant in requested_restaurants if restaurant in globals()]
     daily_menus = [(name, list(weekly_menus.items())[weekday], _) for (name, weekly_menus, _) in weekly_menus]
 
-    name_width = 0
-    price_width = 0
-
-    for (restaurant, (menu_date, menu), _) in daily_menus:
-        if len(menu) == 0 or 'screenshot' in menu[0]:
-            continue
-        longest_meal_name = max(menu, key=lambda it: len(it['name']))['name']
-        longest_price_name = max(menu, key=lambda it: len(it['price']))['price']
-        name_width = max(len(longest_meal_name), len('Název'), name_width)
-        price_width = max(len(longest_price_name), len('Cena'), price_width)
+    # Screenshot menus have no text to measure.
+    measured_menus = [None if len(menu) != 0 and 'screenshot' in menu[0] else measure_menu(menu) for (_, (_, menu), _) in daily_menus]
+    (name_width, price_width) = column_widths(measured for measured in measured_menus if measured is not None)
+    renderer = Renderer(name_width, price_width, plain)
 
-    format_string = '{:3}' + f'{{:{name_width + 1}}} {{:>{price_width + 1}}}'
-
-    for (restaurant, (menu_date, menu), url) in daily_menus:
+    for ((restaurant, (menu_date, menu), url), measured_menu) in zip(daily_menus, measured_menus):
         date_str = menu_date.strftime("%A %e. %B")
-        print(f'{BOLD}{URL_START}{url}{URL_SEP}{restaurant}{URL_END}{NORMAL} {ITALIC}{GREY}{date_str}{NORMAL}')
+        renderer.restaurant_header(restaurant, date_str, url)
 
         if len(menu) != 0 and 'screenshot' in menu[0]:
-            header_str = format_string.format("", "", "")
-            print(f'{DOUBLE_UNDERLINE}{BLUE}{header_str}{NORMAL}')
+            renderer.table_header(empty=True)
             if os.getenv('TERM') == 'xterm-kitty':
-                i = 0
-                data = menu[0]['screenshot']
-                while data:
-                    chunk, data = data[:4096], data[4096:]
-                    if len(chunk) < 4096:
-                        sys.stdout.write('\u001b_Gm=0;')
-                    elif i == 0:
-                        sys.stdout.write('\u001b_Gm=1,a=T,f=100;')
-                    else:
-                        sys.stdout.write('\u001b_Gm=1;')
-                    sys.stdout.write(chunk)
-                    sys.stdout.write('\u001b\\')
-                    i = i + 1
-                sys.stdout.write('\n')
+                renderer.kitty_image(menu[0]['screenshot'])
             continue
 
-        header_str = format_string.format("#", "Název", "Cena")
-        print(f'{DOUBLE_UNDERLINE}{BLUE}{header_str}{NORMAL}')
-
-        for count, meal in enumerate(menu):
-            print(format_string.format(str(count + 1), meal['name'], meal['price']))
+        renderer.table_header()
+        renderer.menu(measured_menu)
 
+    renderer.flush()
     return 0
 
 def weekday_to_number(weekdayStr):
     return {'po': 0, 'út': 1, 'st': 2, 'čt': 3, 'pá': 4, 'ut': 1, 'ct': 3, 'pa': 4}[weekdayStr]
 
 if __name__ == '__main__':
+    # Only when run as a script, obedy_corpus imports this module as a library.
+    requests_cache.install_cache(os.path.join(CACHE_DIR, 'obedy_kobylisy/requests'), 'filesystem', serializer='json', expire_after=CACHE_TIMEOUT) # expire after 30 minutes
+    locale.setlocale(locale.LC_TIME, 'cs_CZ.UTF-8') # You better have this locale installed lmao
+
     if len(sys.argv) >= 2:
         requested_restaurants = [sys.argv[1]]
     else:
@@ -389,5 +386,5 @@ if __name__ == '__main__':
         print('Neznámý den: "' + weekdayStr + '". Podporované formáty: Pátek|pá|pa')
         sys.exit(1)
 
-    code = main(requested_restaurants, weekday)
+    code = main(requested_restaurants, weekday, plain_output())
     sys.exit(code)
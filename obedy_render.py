@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+import os
+import sys
+
+from wcwidth import wcswidth
+
+NORMAL = '\u001b[0m'
+BOLD = '\u001b[1m'
+URL_START = '\u001b]8;;'
+URL_SEP = '\u001b\\'
+URL_END = '\u001b]8;;\u001b\\'
+ITALIC = '\u001b[3m'
+GREY = '\u001b[38;5;7m'
+BLUE = '\u001b[34m'
+DOUBLE_UNDERLINE = '\u001b[21m'
+
+KITTY_CHUNK_SIZE = 4096
+
+def plain_output():
+    # NO_COLOR (https://no-color.org) forces plain output, FORCE_COLOR keeps escape sequences e.g. for `less -R`.
+    if os.getenv('NO_COLOR'):
+        return True
+    if os.getenv('FORCE_COLOR'):
+        return False
+    # Piping the output somewhere (e.g. a chat bot) should not produce escape sequences.
+    return not sys.stdout.isatty()
+
+def display_width(text):
+    width = wcswidth(text)
+    # wcswidth gives up on control characters, fall back to counting code points
+    return width if width >= 0 else len(text)
+
+def measure_menu(menu):
+    # Widths are computed once per meal and reused for both column sizing and padding.
+    return [(meal['name'], display_width(meal['name']), meal['price'], display_width(meal['price'])) for meal in menu]
+
+def column_widths(measured_menus):
+    name_width = display_width('Název')
+    price_width = display_width('Cena')
+    for rows in measured_menus:
+        for (_, meal_name_width, _, meal_price_width) in rows:
+            name_width = max(meal_name_width, name_width)
+            price_width = max(meal_price_width, price_width)
+
+    return (name_width, price_width)
+
+class Renderer:
+    def __init__(self, name_width, price_width, plain=None):
+        self.plain = plain_output() if plain is None else plain
+        self.name_width = name_width
+        self.price_width = price_width
+        self.buffer = []
+
+    def styled(self, text, *styles):
+        if self.plain:
+            self.buffer.append(text)
+            return
+        self.buffer.append(''.join(styles) + text + NORMAL)
+
+    def row(self, count, name, name_width, price, price_width):
+        # Same layout as the old '{:3}{:<name_width + 1} {:>price_width + 1}' format string, but padded by display width.
+        name_padding = ' ' * (self.name_width + 1 - name_width)
+        price_padding = ' ' * (self.price_width + 1 - price_width)
+        return f'{count:3}{name}{name_padding} {price_padding}{price}'
+
+    def restaurant_header(self, restaurant, date_str, url=None):
+        if url is not None and not self.plain:
+            restaurant = f'{URL_START}{url}{URL_SEP}{restaurant}{URL_END}'
+        self.styled(restaurant, BOLD)
+        self.buffer.append(' ')
+        self.styled(date_str, ITALIC, GREY)
+        self.buffer.append('\n')
+
+    def table_header(self, empty=False):
+        if empty:
+            header_str = self.row('', '', 0, '', 0)
+        else:
+            header_str = self.row('#', 'Název', display_width('Název'), 'Cena', display_width('Cena'))
+        self.styled(header_str, DOUBLE_UNDERLINE, BLUE)
+        self.buffer.append('\n')
+
+    def menu(self, measured_menu):
+        for count, (name, name_width, price, price_width) in enumerate(measured_menu):
+            self.buffer.append(self.row(str(count + 1), name, name_width, price, price_width))
+            self.buffer.append('\n')
+
+    def kitty_image(self, data):
+        # Images only make sense when talking to the terminal directly.
+        if self.plain:
+            return
+        chunks = [data[i:i + KITTY_CHUNK_SIZE] for i in range(0, len(data), KITTY_CHUNK_SIZE)]
+        for i, chunk in enumerate(chunks):
+            if len(chunk) < KITTY_CHUNK_SIZE:
+                self.buffer.append('\u001b_Gm=0;')
+            elif i == 0:
+                self.buffer.append('\u001b_Gm=1,a=T,f=100;')
+            else:
+                self.buffer.append('\u001b_Gm=1;')
+            self.buffer.append(chunk)
+            self.buffer.append('\u001b\\')
+        self.buffer.append('\n')
+
+    def flush(self, stream=None):
+        stream = sys.stdout if stream is None else stream
+        frame = ''.join(self.buffer)
+        self.buffer = []
+        # Write the whole frame at once instead of one write per row.
+        if not hasattr(stream, 'buffer'):
+            stream.write(frame)
+            stream.flush()
+            return
+        stream.flush()
+        stream.buffer.write(frame.encode(stream.encoding or 'utf-8'))
+        stream.buffer.flush()